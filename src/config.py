@@ -51,8 +51,7 @@ OCR_BACKENDS = {
         'device': 'auto',  # 'cpu', 'cuda', or 'auto'
         'confidence_threshold': 0.5,
         'default_dpi': 200,
-        'split_regions': True,
-        'num_regions': 4
+        'split_regions': True
     }
 }
 
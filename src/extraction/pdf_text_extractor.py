@@ -2,7 +2,8 @@
 
 import fitz  # PyMuPDF
 import easyocr
-from typing import List
+from typing import List, Union
+from utils.file_handler import open_document
 
 class ScannedPDFExtractor:
     """Extract text from scanned/image-based PDFs using EasyOCR."""
@@ -17,7 +18,7 @@ class ScannedPDFExtractor:
 
     def extract_text(
         self,
-        pdf_path: str,
+        pdf_path: Union[str, fitz.Document],
         pages: List[int] = None,
         dpi: int = 300
     ) -> List[str]:
@@ -25,7 +26,8 @@ class ScannedPDFExtractor:
         Renders pages to images and runs OCR.
 
         Args:
-            pdf_path: path to the PDF file.
+            pdf_path: path to the PDF file, or a document that is already open
+                (e.g. from a PDFSession) to avoid parsing it again.
             pages: list of 0-based page indices to process (None = all).
             dpi: rendering resolution for clarity (higher → slower).
 
@@ -33,20 +35,20 @@ class ScannedPDFExtractor:
             List of strings (one per page).
         """
         texts: List[str] = []
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
-        page_indices = pages if pages is not None else list(range(total_pages))
-
-        for i in page_indices:
-            page = doc[i]
-            # Render page to a PNG-format pixmap in memory
-            pix = page.get_pixmap(dpi=dpi)
-            img_bytes = pix.tobytes("png")
-
-            # Run EasyOCR
-            ocr_result = self.reader.readtext(img_bytes, detail=0)
-            # detail=0 returns only the text strings in reading order
-            page_text = "\n".join(ocr_result)
-            texts.append(page_text)
+        with open_document(pdf_path) as doc:
+            total_pages = len(doc)
+            page_indices = pages if pages is not None else list(range(total_pages))
+
+            for i in page_indices:
+                page = doc[i]
+                # Render page to a PNG-format pixmap in memory
+                pix = page.get_pixmap(dpi=dpi)
+                img_bytes = pix.tobytes("png")
+
+                # Run EasyOCR
+                ocr_result = self.reader.readtext(img_bytes, detail=0)
+                # detail=0 returns only the text strings in reading order
+                page_text = "\n".join(ocr_result)
+                texts.append(page_text)
 
         return texts
@@ -100,13 +100,13 @@ Examples:
     
     # Check if PDF exists
     if not os.path.exists(args.pdf):
-        logger.error(f"PDF file not found: {args.pdf}")
+        logger.error("PDF file not found: %s", args.pdf)
         print(f"❌ PDF file not found: {args.pdf}")
         print("Please provide a valid PDF path or use --demo to run with test data.")
         return 1
     
     # Analyze PDF type
-    logger.info(f"Analyzing PDF: {args.pdf}")
+    logger.info("Analyzing PDF: %s", args.pdf)
     pdf_type = detect_pdf_type(args.pdf)
     print(f"📄 PDF Type: {pdf_type}")
     
@@ -307,6 +307,6 @@ if __name__ == "__main__":
         print("\n🛑 Operation cancelled by user")
         sys.exit(1)
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         print(f"❌ Error: {e}")
         sys.exit(1)
\ No newline at end of file
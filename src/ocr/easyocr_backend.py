@@ -11,6 +11,9 @@ import time
 from typing import List, Dict, Any, Tuple
 import os
 
+from config import OCR_BACKENDS
+from utils.pdf_renderer import is_blank_page
+
 logger = logging.getLogger(__name__)
 
 class EasyOCRBackend:
@@ -32,7 +35,7 @@ class EasyOCRBackend:
     def _initialize_reader(self):
         """Initialize the EasyOCR reader"""
         try:
-            logger.info(f"Initializing EasyOCR with languages: {self.languages}")
+            logger.info("Initializing EasyOCR with languages: %s", self.languages)
             self.reader = easyocr.Reader(
                 lang_list=self.languages,
                 gpu=self.gpu,
@@ -40,11 +43,11 @@ class EasyOCRBackend:
             )
             logger.info("EasyOCR reader initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize EasyOCR reader: {e}")
+            logger.error("Failed to initialize EasyOCR reader: %s", e)
             raise
     
     def extract_text_from_pdf(self, pdf_path: str, pages: List[int] = None, 
-                             dpi: int = 200, confidence_threshold: float = 0.3) -> Dict[str, Any]:
+                             dpi: int = 200, confidence_threshold: float = None) -> Dict[str, Any]:
         """
         Extract text from PDF using EasyOCR
         
@@ -53,6 +56,7 @@ class EasyOCRBackend:
             pages: List of page numbers to process (0-indexed). If None, process all pages
             dpi: DPI for PDF to image conversion
             confidence_threshold: Minimum confidence threshold for text detection
+                (defaults to OCR_BACKENDS['EasyOCR']['confidence_threshold'])
             
         Returns:
             Dictionary containing extracted text and metadata
@@ -63,6 +67,13 @@ class EasyOCRBackend:
         if self.reader is None:
             self._initialize_reader()
         
+        # Snapshot config values once so the page loop does no dict lookups
+        cfg = OCR_BACKENDS['EasyOCR']
+        width_ths = cfg['width_ths']
+        height_ths = cfg['height_ths']
+        if confidence_threshold is None:
+            confidence_threshold = cfg['confidence_threshold']
+        
         start_time = time.time()
         results = {
             'full_text': '',
@@ -76,7 +87,7 @@ class EasyOCRBackend:
         
         try:
             # Convert PDF to images
-            logger.info(f"Converting PDF to images: {pdf_path}")
+            logger.info("Converting PDF to images: %s", pdf_path)
             pdf_images = convert_from_path(
                 pdf_path, 
                 dpi=dpi,
@@ -85,24 +96,39 @@ class EasyOCRBackend:
             )
             
             results['total_pages'] = len(pdf_images)
-            logger.info(f"Converted {len(pdf_images)} pages to images")
+            logger.info("Converted %d pages to images", len(pdf_images))
             
             all_confidences = []
             page_texts = []
             
             for page_num, image in enumerate(pdf_images):
                 actual_page_num = pages[page_num] if pages else page_num
-                logger.info(f"Processing page {actual_page_num + 1}")
+                logger.info("Processing page %d", actual_page_num + 1)
+                
+                # Skip the detector/recognizer entirely on blank pages; same ink
+                # count as the other backends, so sparse pages are still OCRed
+                if is_blank_page(image):
+                    logger.info("Page %d: blank, skipping OCR", actual_page_num + 1)
+                    results['page_results'].append({
+                        'page_number': actual_page_num + 1,
+                        'text': '',
+                        'word_count': 0,
+                        'avg_confidence': 0.0,
+                        'raw_result': []
+                    })
+                    page_texts.append(f"--- Page {actual_page_num + 1} ---\n")
+                    continue
                 
-                # Convert PIL image to numpy array
-                image_np = np.array(image)
+                # Convert PIL image to numpy array; asarray wraps the buffer PIL
+                # exports instead of copying it a second time like np.array
+                image_np = np.asarray(image)
                 
                 # Extract text using EasyOCR
                 ocr_results = self.reader.readtext(
                     image_np,
                     paragraph=False,
-                    width_ths=0.7,
-                    height_ths=0.7
+                    width_ths=width_ths,
+                    height_ths=height_ths
                 )
                 
                 # Process results
@@ -129,33 +155,33 @@ class EasyOCRBackend:
                     'page_number': actual_page_num + 1,
                     'text': page_text,
                     'word_count': page_word_count,
-                    'avg_confidence': float(page_avg_confidence),
+                    'avg_confidence': page_avg_confidence,
                     'raw_result': raw_results
                 }
                 
                 results['page_results'].append(page_result)
+                results['total_words'] += page_word_count
                 page_texts.append(f"--- Page {actual_page_num + 1} ---\n{page_text}")
                 
                 if page_confidences:
                     all_confidences.extend(page_confidences)
                 
-                logger.info(f"Page {actual_page_num + 1}: {page_word_count} words, "
-                           f"avg confidence: {page_avg_confidence:.3f}")
+                logger.info("Page %d: %d words, avg confidence: %.3f",
+                            actual_page_num + 1, page_word_count, page_avg_confidence)
             
             # Combine results
             results['full_text'] = '\n'.join(page_texts)
-            results['total_words'] = sum(page['word_count'] for page in results['page_results'])
-            results['overall_confidence'] = float(np.mean(all_confidences)) if all_confidences else 0.0
+            results['overall_confidence'] = np.mean(all_confidences) if all_confidences else 0.0
             results['processing_time'] = time.time() - start_time
             
-            logger.info(f"EasyOCR extraction completed: {results['total_words']} words, "
-                       f"overall confidence: {results['overall_confidence']:.3f}, "
-                       f"time: {results['processing_time']:.2f}s")
+            logger.info("EasyOCR extraction completed: %d words, "
+                        "overall confidence: %.3f, time: %.2fs",
+                        results['total_words'], results['overall_confidence'], results['processing_time'])
             
             return results
             
         except Exception as e:
-            logger.error(f"Error during EasyOCR text extraction: {e}")
+            logger.error("Error during EasyOCR text extraction: %s", e)
             raise
     
     def benchmark_performance(self, pdf_path: str, num_pages: int = 3) -> Dict[str, float]:
@@ -181,7 +207,7 @@ class EasyOCRBackend:
                 'backend': 'EasyOCR'
             }
         except Exception as e:
-            logger.error(f"Error during EasyOCR benchmarking: {e}")
+            logger.error("Error during EasyOCR benchmarking: %s", e)
             return {
                 'processing_time': float('inf'),
                 'pages_per_second': 0,
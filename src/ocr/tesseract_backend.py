@@ -3,30 +3,205 @@ Tesseract OCR backend for text extraction from PDFs
 Supports Arabic and English text recognition with pytesseract
 """
 
+import asyncio
 import pytesseract
 import numpy as np
-from pdf2image import convert_from_path
 from PIL import Image
 import logging
 import time
 import os
 import subprocess
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+try:
+    # Optional: in-process Tesseract API that releases the GIL while recognizing
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+from config import OCR_BACKENDS
+from utils.pdf_renderer import render_pdf_pages, prerender_pdf_pages, is_blank_page, page_number
+from utils.raw_results import raw_result_columns, empty_raw_result
 
 logger = logging.getLogger(__name__)
 
+# One tesserocr API per worker thread; an API instance is not thread-safe
+_thread_state = threading.local()
+
+
+def _init_ocr_worker(tesseract_cmd: str):
+    """Configure a page OCR worker process"""
+    # Pages are already spread across processes; Tesseract's own OpenMP
+    # threads would only oversubscribe the cores
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _page_text_from_data(detailed_data: Dict[str, list]) -> str:
+    """
+    Rebuild Tesseract's plain-text output from image_to_data words
+    
+    Words on the same line are joined by spaces, lines by newlines, and
+    paragraphs (or blocks) are separated by an empty line.
+    
+    Args:
+        detailed_data: Dictionary in the layout of pytesseract's image_to_data
+        
+    Returns:
+        Page text
+    """
+    lines = []
+    words = []
+    current_line = current_par = None
+    for block_num, par_num, line_num, word in zip(detailed_data['block_num'], detailed_data['par_num'],
+                                                 detailed_data['line_num'], detailed_data['text']):
+        word = word.strip() if word else ''
+        if not word:
+            continue
+        
+        line_key = (block_num, par_num, line_num)
+        if line_key != current_line:
+            if words:
+                lines.append(' '.join(words))
+                words = []
+            if current_par is not None and line_key[:2] != current_par:
+                lines.append('')
+            current_line, current_par = line_key, line_key[:2]
+        words.append(word)
+    
+    if words:
+        lines.append(' '.join(words))
+    return '\n'.join(lines)
+
+
+def _blank_page_data() -> Dict[str, list]:
+    """image_to_data-style result of a page skipped as blank"""
+    keys = ('block_num', 'par_num', 'line_num', 'word_num',
+            'left', 'top', 'width', 'height', 'conf', 'text')
+    data = {key: [] for key in keys}
+    data['blank'] = True
+    return data
+
+
+def _load_page(image_path: str) -> Optional[Image.Image]:
+    """Decode a rendered page inside the worker; None if the page is blank"""
+    image = Image.open(image_path)
+    image.load()
+    return None if is_blank_page(image) else image
+
+
+def _ocr_page(image_path: str, languages: str, config: str) -> Dict[str, list]:
+    """
+    Run Tesseract on one page in a worker process
+    
+    Only the path crosses the process boundary; the worker reads the
+    rendered page itself instead of unpickling its pixels.
+    
+    Args:
+        image_path: Path of the rendered page image
+        languages: Language codes for Tesseract
+        config: Tesseract config string (OEM/PSM flags)
+        
+    Returns:
+        image_to_data dictionary
+    """
+    if _load_page(image_path) is None:
+        return _blank_page_data()
+    
+    # A single Tesseract run: the page text is rebuilt from these words. Given
+    # the path, tesseract reads the rendered file itself instead of pytesseract
+    # re-encoding the image to a temporary file first
+    return pytesseract.image_to_data(
+        image_path,
+        lang=languages,
+        config=config,
+        output_type=pytesseract.Output.DICT
+    )
+
+
+def _get_tesserocr_api(languages: str, psm: int, oem: int):
+    """Return this thread's tesserocr API, creating it (and loading tessdata) once"""
+    key = (languages, psm, oem)
+    apis = getattr(_thread_state, 'apis', None)
+    if apis is None:
+        apis = _thread_state.apis = {}
+    if key not in apis:
+        apis[key] = tesserocr.PyTessBaseAPI(lang=languages, psm=psm, oem=oem)
+    return apis[key]
+
+
+def _ocr_page_tesserocr(image_path: str, languages: str, psm: int,
+                        oem: int) -> Dict[str, list]:
+    """
+    Run Tesseract on one page in-process through tesserocr
+    
+    Args:
+        image_path: Path of the rendered page image
+        languages: Language codes for Tesseract
+        psm: Page Segmentation Mode
+        oem: OCR Engine Mode
+        
+    Returns:
+        Dictionary in the layout of pytesseract's image_to_data
+    """
+    image = _load_page(image_path)
+    if image is None:
+        return _blank_page_data()
+    
+    api = _get_tesserocr_api(languages, psm, oem)
+    api.SetImage(image)
+    api.Recognize()
+    
+    detailed_data = {key: [] for key in ('block_num', 'par_num', 'line_num', 'word_num',
+                                         'left', 'top', 'width', 'height', 'conf', 'text')}
+    block_num = par_num = line_num = word_num = 0
+    level = tesserocr.RIL.WORD
+    for word in tesserocr.iterate_level(api.GetIterator(), level):
+        if word.IsAtBeginningOf(tesserocr.RIL.BLOCK):
+            block_num, par_num, line_num, word_num = block_num + 1, 0, 0, 0
+        if word.IsAtBeginningOf(tesserocr.RIL.PARA):
+            par_num, line_num, word_num = par_num + 1, 0, 0
+        if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+            line_num, word_num = line_num + 1, 0
+        word_num += 1
+        
+        bbox = word.BoundingBox(level)
+        if bbox is None:
+            continue
+        left, top, right, bottom = bbox
+        detailed_data['block_num'].append(block_num)
+        detailed_data['par_num'].append(par_num)
+        detailed_data['line_num'].append(line_num)
+        detailed_data['word_num'].append(word_num)
+        detailed_data['left'].append(left)
+        detailed_data['top'].append(top)
+        detailed_data['width'].append(right - left)
+        detailed_data['height'].append(bottom - top)
+        detailed_data['conf'].append(word.Confidence(level))
+        detailed_data['text'].append(word.GetUTF8Text(level) or '')
+    
+    return detailed_data
+
+
 class TesseractBackend:
     """Tesseract OCR implementation for PDF text extraction"""
     
-    def __init__(self, languages='ara+eng', tesseract_cmd=None):
+    def __init__(self, languages='ara+eng', tesseract_cmd=None, max_workers=None):
         """
         Initialize Tesseract backend
         
         Args:
             languages: Language codes for Tesseract (e.g., 'ara+eng' for Arabic and English)
             tesseract_cmd: Path to tesseract executable (optional)
+            max_workers: Number of pages OCRed in parallel (defaults to CPU count). Uses
+                threads over in-process tesserocr APIs when tesserocr is installed,
+                otherwise processes driving the tesseract binary
         """
         self.languages = languages
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
         
         # Set tesseract command path if provided
         if tesseract_cmd:
@@ -39,9 +214,9 @@ class TesseractBackend:
         """Check if Tesseract is properly installed"""
         try:
             version = pytesseract.get_tesseract_version()
-            logger.info(f"Tesseract version: {version}")
+            logger.info("Tesseract version: %s", version)
         except Exception as e:
-            logger.error(f"Tesseract not found or not properly configured: {e}")
+            logger.error("Tesseract not found or not properly configured: %s", e)
             raise RuntimeError("Tesseract OCR not available. Please install tesseract-ocr.")
     
     def _check_language_support(self):
@@ -56,16 +231,36 @@ class TesseractBackend:
                     missing_langs.append(lang)
             
             if missing_langs:
-                logger.warning(f"Missing language data for: {missing_langs}")
-                logger.info(f"Available languages: {available_languages}")
+                logger.warning("Missing language data for: %s", missing_langs)
+                logger.info("Available languages: %s", available_languages)
             else:
-                logger.info(f"All required languages available: {required_langs}")
+                logger.info("All required languages available: %s", required_langs)
                 
         except Exception as e:
-            logger.warning(f"Could not check language support: {e}")
+            logger.warning("Could not check language support: %s", e)
+    
+    def _get_executor(self) -> Executor:
+        """Return the page OCR pool, starting it on first use"""
+        if self._executor is None and tesserocr is not None:
+            # tesserocr releases the GIL during recognition, so threads scale
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        elif self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_ocr_worker,
+                initargs=(pytesseract.pytesseract.tesseract_cmd,)
+            )
+        return self._executor
+    
+    def close(self):
+        """Shut down the page OCR pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
     
     def extract_text_from_pdf(self, pdf_path: str, pages: List[int] = None, 
-                             dpi: int = 200, psm: int = 6) -> Dict[str, Any]:
+                             dpi: int = 200, psm: int = None,
+                             cache_pages: bool = False) -> Dict[str, Any]:
         """
         Extract text from PDF using Tesseract
         
@@ -73,7 +268,9 @@ class TesseractBackend:
             pdf_path: Path to the PDF file
             pages: List of page numbers to process (0-indexed). If None, process all pages
             dpi: DPI for PDF to image conversion
-            psm: Page Segmentation Mode for Tesseract (6 = uniform block of text)
+            psm: Page Segmentation Mode for Tesseract (6 = uniform block of text,
+                defaults to OCR_BACKENDS['Tesseract']['psm'])
+            cache_pages: Use the shared page cache (e.g. after prerender_pdf_pages)
             
         Returns:
             Dictionary containing extracted text and metadata
@@ -93,115 +290,145 @@ class TesseractBackend:
         }
         
         try:
-            # Configure Tesseract
-            config = f'--psm {psm} -l {self.languages}'
-            
-            # Convert PDF to images
-            logger.info(f"Converting PDF to images: {pdf_path}")
-            pdf_images = convert_from_path(
-                pdf_path, 
-                dpi=dpi,
-                first_page=pages[0] + 1 if pages else None,
-                last_page=pages[-1] + 1 if pages else None
-            )
-            
-            results['total_pages'] = len(pdf_images)
-            logger.info(f"Converted {len(pdf_images)} pages to images")
+            # Configure Tesseract once instead of rebuilding the string per page
+            cfg = OCR_BACKENDS['Tesseract']
+            if psm is None:
+                psm = cfg['psm']
+            config = f"--oem {cfg['oem']} --psm {psm}"
             
-            all_confidences = []
-            page_texts = []
-            
-            for page_num, image in enumerate(pdf_images):
-                actual_page_num = pages[page_num] if pages else page_num
-                logger.info(f"Processing page {actual_page_num + 1}")
+            # Convert PDF to grayscale images, rendering on every core; Tesseract
+            # binarizes internally, so colour would only triple the bytes moved
+            logger.info("Converting PDF to images: %s", pdf_path)
+            with render_pdf_pages(pdf_path, dpi=dpi, pages=pages, grayscale=True,
+                                  cache=cache_pages) as page_paths:
+                results['total_pages'] = len(page_paths)
+                logger.info("Converted %d pages to images", len(page_paths))
                 
-                # Extract text using Tesseract
-                try:
-                    page_text = pytesseract.image_to_string(
-                        image, 
-                        lang=self.languages,
-                        config=f'--psm {psm}'
-                    )
-                    
-                    # Get detailed data with confidence scores
-                    detailed_data = pytesseract.image_to_data(
-                        image,
-                        lang=self.languages,
-                        config=f'--psm {psm}',
-                        output_type=pytesseract.Output.DICT
-                    )
-                    
-                    # Extract confidence scores
-                    confidences = []
-                    raw_results = []
-                    
-                    for i, confidence in enumerate(detailed_data['conf']):
-                        if int(confidence) > 0:  # Valid confidence score
-                            word = detailed_data['text'][i].strip()
-                            if word:  # Non-empty word
-                                confidences.append(int(confidence))
-                                raw_results.append({
-                                    'bbox': [
-                                        detailed_data['left'][i],
-                                        detailed_data['top'][i],
-                                        detailed_data['left'][i] + detailed_data['width'][i],
-                                        detailed_data['top'][i] + detailed_data['height'][i]
-                                    ],
-                                    'text': word,
-                                    'confidence': int(confidence) / 100.0  # Convert to 0-1 scale
-                                })
-                    
-                    page_word_count = len(page_text.split()) if page_text.strip() else 0
-                    page_avg_confidence = np.mean(confidences) / 100.0 if confidences else 0.0
-                    
-                    # Store page results
-                    page_result = {
-                        'page_number': actual_page_num + 1,
-                        'text': page_text.strip(),
-                        'word_count': page_word_count,
-                        'avg_confidence': float(page_avg_confidence),
-                        'raw_result': raw_results
-                    }
-                    
-                    results['page_results'].append(page_result)
-                    page_texts.append(f"--- Page {actual_page_num + 1} ---\n{page_text.strip()}")
-                    
-                    if confidences:
-                        all_confidences.extend([c / 100.0 for c in confidences])
-                    
-                    logger.info(f"Page {actual_page_num + 1}: {page_word_count} words, "
-                               f"avg confidence: {page_avg_confidence:.3f}")
+                all_confidences = []
+                page_texts = []
+                
+                # OCR pages in parallel, one Tesseract instance per core. Workers
+                # get page paths and decode the pages themselves, so no pixels are
+                # pickled and at most one decoded page per worker is in memory;
+                # blank pages are detected there and skipped
+                executor = self._get_executor()
+                if tesserocr is not None:
+                    futures = [
+                        executor.submit(_ocr_page_tesserocr, path, self.languages, psm, cfg['oem'])
+                        for path in page_paths
+                    ]
+                else:
+                    futures = [
+                        executor.submit(_ocr_page, path, self.languages, config)
+                        for path in page_paths
+                    ]
+                
+                # Collect in page order; each result is post-processed as it arrives
+                for page_num, future in enumerate(futures):
+                    actual_page_num = page_number(page_paths[page_num])
+                    logger.info("Processing page %d", actual_page_num + 1)
                     
-                except Exception as e:
-                    logger.error(f"Error processing page {actual_page_num + 1}: {e}")
-                    # Add empty page result
-                    page_result = {
-                        'page_number': actual_page_num + 1,
-                        'text': '',
-                        'word_count': 0,
-                        'avg_confidence': 0.0,
-                        'raw_result': [],
-                        'error': str(e)
-                    }
-                    results['page_results'].append(page_result)
-                    page_texts.append(f"--- Page {actual_page_num + 1} ---\n[Error: {e}]")
+                    # Extract text using Tesseract
+                    try:
+                        detailed_data = future.result()
+                        if detailed_data.get('blank'):
+                            logger.info("Page %d is blank, skipped OCR", actual_page_num + 1)
+                        page_text = _page_text_from_data(detailed_data)
+                        
+                        # Keep words with a valid confidence score and non-empty text,
+                        # masking the parallel column arrays once instead of per word
+                        conf = np.asarray(detailed_data['conf'], dtype=np.float32).astype(np.int32)
+                        words = np.char.strip(np.asarray(detailed_data['text'], dtype=str))
+                        mask = (conf > 0) & (np.char.str_len(words) > 0)
+                        
+                        confidences = conf[mask] / 100.0  # Convert to 0-1 scale
+                        words = words[mask]
+                        lefts = np.asarray(detailed_data['left'], dtype=np.int32)[mask]
+                        tops = np.asarray(detailed_data['top'], dtype=np.int32)[mask]
+                        rights = lefts + np.asarray(detailed_data['width'], dtype=np.int32)[mask]
+                        bottoms = tops + np.asarray(detailed_data['height'], dtype=np.int32)[mask]
+                        
+                        # Words are stored column-wise; utils.raw_results.to_records
+                        # gives back the per-word dicts
+                        raw_results = raw_result_columns(
+                            np.stack([lefts, tops, rights, bottoms], axis=1), words, confidences
+                        )
+                        
+                        page_word_count = len(words)
+                        page_avg_confidence = confidences.mean() if page_word_count else 0.0
+                        
+                        # Store page results
+                        page_result = {
+                            'page_number': actual_page_num + 1,
+                            'text': page_text.strip(),
+                            'word_count': page_word_count,
+                            'avg_confidence': float(page_avg_confidence),
+                            'raw_result': raw_results
+                        }
+                        
+                        results['page_results'].append(page_result)
+                        results['total_words'] += page_word_count
+                        page_texts.append(f"--- Page {actual_page_num + 1} ---\n{page_text.strip()}")
+                        
+                        all_confidences.extend(confidences.tolist())
+                        
+                        logger.info("Page %d: %d words, avg confidence: %.3f",
+                                    actual_page_num + 1, page_word_count, page_avg_confidence)
+                        
+                    except Exception as e:
+                        logger.error("Error processing page %d: %s", actual_page_num + 1, e)
+                        # Add empty page result
+                        page_result = {
+                            'page_number': actual_page_num + 1,
+                            'text': '',
+                            'word_count': 0,
+                            'avg_confidence': 0.0,
+                            'raw_result': empty_raw_result(),
+                            'error': str(e)
+                        }
+                        results['page_results'].append(page_result)
+                        page_texts.append(f"--- Page {actual_page_num + 1} ---\n[Error: {e}]")
             
             # Combine results
             results['full_text'] = '\n'.join(page_texts)
-            results['total_words'] = sum(page['word_count'] for page in results['page_results'])
             results['overall_confidence'] = float(np.mean(all_confidences)) if all_confidences else 0.0
             results['processing_time'] = time.time() - start_time
             
-            logger.info(f"Tesseract extraction completed: {results['total_words']} words, "
-                       f"overall confidence: {results['overall_confidence']:.3f}, "
-                       f"time: {results['processing_time']:.2f}s")
+            logger.info("Tesseract extraction completed: %d words, "
+                        "overall confidence: %.3f, time: %.2fs",
+                        results['total_words'], results['overall_confidence'], results['processing_time'])
             
             return results
             
         except Exception as e:
-            logger.error(f"Error during Tesseract text extraction: {e}")
+            logger.error("Error during Tesseract text extraction: %s", e)
             raise
     
+    async def extract_text_from_pdf_async(self, pdf_path: str, pages: List[int] = None,
+                                          dpi: int = 200, psm: int = None) -> Dict[str, Any]:
+        """
+        Event-loop friendly extract_text_from_pdf for use from async servers
+        
+        Rasterization is serialized across requests and runs off the loop; the
+        OCR then runs in a worker thread that feeds the page pool.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            pages: List of page numbers to process (0-indexed). If None, process all pages
+            dpi: DPI for PDF to image conversion
+            psm: Page Segmentation Mode for Tesseract
+            
+        Returns:
+            Dictionary containing extracted text and metadata
+        """
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        
+        # Same settings as extract_text_from_pdf, so it finds the pages cached
+        await prerender_pdf_pages(pdf_path, dpi=dpi, pages=pages, grayscale=True)
+        return await asyncio.to_thread(self.extract_text_from_pdf, pdf_path, pages, dpi, psm,
+                                       cache_pages=True)
+    
     def benchmark_performance(self, pdf_path: str, num_pages: int = 3) -> Dict[str, float]:
         """
         Benchmark the performance of Tesseract on the given PDF
@@ -225,7 +452,7 @@ class TesseractBackend:
                 'backend': 'Tesseract'
             }
         except Exception as e:
-            logger.error(f"Error during Tesseract benchmarking: {e}")
+            logger.error("Error during Tesseract benchmarking: %s", e)
             return {
                 'processing_time': float('inf'),
                 'pages_per_second': 0,
@@ -3,14 +3,17 @@ OCR Evaluation Framework
 Comprehensive comparison system for multiple OCR backends
 """
 
-import json
 import logging
 import time
 import os
+import hashlib
+import json
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Literal
 from datetime import datetime
 import concurrent.futures
+import multiprocessing
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 
 # Import OCR backends
@@ -18,60 +21,206 @@ from ocr.paddleocr_backend import PaddleOCRBackend
 from ocr.easyocr_backend import EasyOCRBackend
 from ocr.tesseract_backend import TesseractBackend
 from ocr.trocr_backend import TrOCRBackend
+from config import OCR_BACKENDS, PDF_SETTINGS
 from utils.logger import setup_logger
+from utils.pdf_renderer import BLANK_INK_LEVEL, BLANK_INK_RATIO
+from utils.file_handler import prefetch_file
+from utils.raw_results import json_default, NumpyJSONEncoder
+
+try:
+    # orjson serializes numpy scalars/arrays natively in C and emits UTF-8
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+ParallelMode = Literal['thread', 'process', 'sequential']
+
+# Backends in the order they are initialized
+BACKEND_NAMES = ['PaddleOCR', 'EasyOCR', 'Tesseract', 'TrOCR']
+
+# Part of every result cache key; bump it when a backend's output changes, so
+# results cached by older code are not returned
+RESULT_CACHE_VERSION = 2
+
+# Extra extract_text_from_pdf arguments used when evaluating a backend. Every
+# backend must really OCR every page: PaddleOCR would otherwise return embedded
+# text layers at full confidence in almost no time and win both rankings
+EXTRACTION_OPTIONS = {
+    'PaddleOCR': {'use_text_layer': False}
+}
+
+
+def _create_backend(backend_name: str):
+    """Construct a backend by name with the framework's settings"""
+    if backend_name == 'PaddleOCR':
+        return PaddleOCRBackend(lang='ar')
+    if backend_name == 'EasyOCR':
+        return EasyOCRBackend(languages=['ar', 'en'])
+    if backend_name == 'Tesseract':
+        return TesseractBackend(languages='ara+eng')
+    if backend_name == 'TrOCR':
+        return TrOCRBackend()
+    raise ValueError(f"Unknown backend '{backend_name}'. Known: {BACKEND_NAMES}")
+
+
+@contextmanager
+def _omp_thread_limit(num_threads: int):
+    """
+    Set OMP_NUM_THREADS for the worker processes started inside the block
+    
+    A spawned worker inherits the environment and reads it before numpy,
+    torch or paddle load their OpenMP runtimes; set inside the worker it
+    would come too late to have any effect.
+    """
+    previous = os.environ.get('OMP_NUM_THREADS')
+    os.environ['OMP_NUM_THREADS'] = str(num_threads)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop('OMP_NUM_THREADS', None)
+        else:
+            os.environ['OMP_NUM_THREADS'] = previous
+
+
+def _evaluate_in_process(output_dir: str, use_cache: bool, backend_name: str, pdf_path: str,
+                         pages: Optional[List[int]], num_threads: int) -> Dict[str, Any]:
+    """
+    Worker entry point for process-parallel comparisons
+    
+    The worker builds only its own backend, and caps torch's intra-op threads
+    (OpenMP is capped through the inherited OMP_NUM_THREADS) so that the
+    backends running side by side do not oversubscribe the cores.
+    """
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+    
+    framework = OCREvaluationFramework(output_dir, use_cache=use_cache, backends=[backend_name])
+    return framework.evaluate_single_backend(backend_name, pdf_path, pages)
+
+
+def _dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize results to UTF-8 JSON, with orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        # The object-dtype text columns of raw_result go through json_default
+        return orjson.dumps(obj, default=json_default, option=option)
+    return json.dumps(obj, cls=NumpyJSONEncoder, ensure_ascii=False,
+                      indent=2 if indent else None, sort_keys=sort_keys).encode('utf-8')
+
+
+def _dump_to(path: Path, obj: Any, indent: bool = False) -> None:
+    """
+    Write results as UTF-8 JSON to a file
+    
+    orjson builds the whole document in C in one call. Without it, the
+    encoder's chunks are streamed to the file, so the full indented string
+    never exists in memory.
+    """
+    if orjson is not None:
+        path.write_bytes(_dumps(obj, indent=indent))
+        return
+    encoder = NumpyJSONEncoder(ensure_ascii=False, indent=2 if indent else None)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(encoder.iterencode(obj))
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON written by _dumps"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 class OCREvaluationFramework:
     """Comprehensive OCR evaluation and comparison framework"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", use_cache: bool = False,
+                 backends: List[str] = None):
         """
         Initialize the OCR evaluation framework
         
         Args:
             output_dir: Directory to save results
+            use_cache: Reuse earlier results of the same backend, settings, PDF
+                content and pages from output_dir/.cache. Off by default, since
+                cached runs carry no fresh timing; they are left out of the
+                speed and overall rankings
+            backends: Names of the backends to offer (None for all); each is
+                only constructed when it is first used
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.use_cache = use_cache
+        self.cache_dir = self.output_dir / ".cache"
+        self._pdf_digests = {}
         
-        # Available backends
+        # Offered backends; constructed lazily since each loads its own models
+        self.backend_names = list(backends or BACKEND_NAMES)
         self.backends = {}
-        self._initialize_backends()
+        self._failed_backends = {}
     
-    def _initialize_backends(self):
-        """Initialize all available OCR backends"""
-        logger.info("Initializing OCR backends...")
+    def _get_backend(self, backend_name: str):
+        """Return the backend, constructing it on first use (None if it failed to initialize)"""
+        if backend_name in self.backends:
+            return self.backends[backend_name]
+        if backend_name in self._failed_backends or backend_name not in self.backend_names:
+            return None
         
-        # PaddleOCR
         try:
-            self.backends['PaddleOCR'] = PaddleOCRBackend(lang='ar')
-            logger.info("✓ PaddleOCR initialized")
+            self.backends[backend_name] = _create_backend(backend_name)
+            logger.info("✓ %s initialized", backend_name)
+            return self.backends[backend_name]
         except Exception as e:
-            logger.warning(f"✗ PaddleOCR failed to initialize: {e}")
-        
-        # EasyOCR
-        try:
-            self.backends['EasyOCR'] = EasyOCRBackend(languages=['ar', 'en'])
-            logger.info("✓ EasyOCR initialized")
-        except Exception as e:
-            logger.warning(f"✗ EasyOCR failed to initialize: {e}")
+            # Remembered, so a broken backend is not retried on every call
+            self._failed_backends[backend_name] = str(e)
+            logger.warning("✗ %s failed to initialize: %s", backend_name, e)
+            return None
+    
+    def _initialize_backends(self, backend_names: List[str]):
+        """Initialize the requested OCR backends, skipping any that fail"""
+        logger.info("Initializing OCR backends...")
         
-        # Tesseract
-        try:
-            self.backends['Tesseract'] = TesseractBackend(languages='ara+eng')
-            logger.info("✓ Tesseract initialized")
-        except Exception as e:
-            logger.warning(f"✗ Tesseract failed to initialize: {e}")
+        for backend_name in backend_names:
+            self._get_backend(backend_name)
         
-        # TrOCR
-        try:
-            self.backends['TrOCR'] = TrOCRBackend()
-            logger.info("✓ TrOCR initialized")
-        except Exception as e:
-            logger.warning(f"✗ TrOCR failed to initialize: {e}")
-        
-        logger.info(f"Initialized {len(self.backends)} OCR backends: {list(self.backends.keys())}")
+        logger.info("Initialized %d OCR backends: %s", len(self.backends), list(self.backends.keys()))
+    
+    def _pdf_digest(self, pdf_path: str) -> str:
+        """SHA-256 of the PDF content, hashed once per (path, mtime, size)"""
+        stat = os.stat(pdf_path)
+        key = (os.path.abspath(pdf_path), stat.st_mtime, stat.st_size)
+        if key not in self._pdf_digests:
+            digest = hashlib.sha256()
+            with open(pdf_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            self._pdf_digests[key] = digest.hexdigest()
+        return self._pdf_digests[key]
+    
+    def _cache_path(self, backend_name: str, pdf_path: str, pages: Optional[List[int]]) -> Path:
+        """Cache file for a backend run; the key covers the backend's settings and the config"""
+        backend = self.backends[backend_name]
+        settings = {name: value for name, value in vars(backend).items()
+                    if not name.startswith('_') and isinstance(value, (str, int, float, bool, type(None)))}
+        config = {
+            'backend': OCR_BACKENDS.get(backend_name),
+            'pdf': PDF_SETTINGS,
+            'blank_page': [BLANK_INK_LEVEL, BLANK_INK_RATIO],
+            'options': EXTRACTION_OPTIONS.get(backend_name)
+        }
+        key = _dumps(
+            [RESULT_CACHE_VERSION, backend_name, type(backend).__name__, settings, config,
+             self._pdf_digest(pdf_path), pages],
+            sort_keys=True
+        )
+        return self.cache_dir / f"{hashlib.sha256(key).hexdigest()}.json"
     
     def evaluate_single_backend(self, backend_name: str, pdf_path: str, 
                                pages: List[int] = None) -> Dict[str, Any]:
@@ -86,17 +235,25 @@ class OCREvaluationFramework:
         Returns:
             Evaluation results dictionary
         """
-        if backend_name not in self.backends:
-            raise ValueError(f"Backend '{backend_name}' not available. Available: {list(self.backends.keys())}")
-        
-        backend = self.backends[backend_name]
+        backend = self._get_backend(backend_name)
+        if backend is None:
+            available = [name for name in self.backend_names if name not in self._failed_backends]
+            raise ValueError(f"Backend '{backend_name}' not available. Available: {available}")
+        
+        cache_path = self._cache_path(backend_name, pdf_path, pages) if self.use_cache else None
+        if cache_path is not None and cache_path.exists():
+            logger.info("Using cached %s results for %s", backend_name, pdf_path)
+            results = _loads(cache_path.read_bytes())
+            results['evaluation']['cached'] = True
+            return results
         
-        logger.info(f"Evaluating {backend_name} on {pdf_path}")
+        logger.info("Evaluating %s on %s", backend_name, pdf_path)
         start_time = time.time()
         
         try:
             # Extract text
-            results = backend.extract_text_from_pdf(pdf_path, pages=pages)
+            results = backend.extract_text_from_pdf(pdf_path, pages=pages,
+                                                    **EXTRACTION_OPTIONS.get(backend_name, {}))
             
             # Add evaluation metadata
             results['evaluation'] = {
@@ -108,10 +265,15 @@ class OCREvaluationFramework:
                 'success': True
             }
             
+            if cache_path is not None:
+                # Only successful runs are cached; failures are retried next time
+                self.cache_dir.mkdir(exist_ok=True)
+                _dump_to(cache_path, results)
+            
             return results
             
         except Exception as e:
-            logger.error(f"Error evaluating {backend_name}: {e}")
+            logger.error("Error evaluating %s: %s", backend_name, e)
             return {
                 'backend': backend_name,
                 'evaluation': {
@@ -126,7 +288,8 @@ class OCREvaluationFramework:
             }
     
     def compare_backends(self, pdf_path: str, pages: List[int] = None, 
-                        backends: List[str] = None, parallel: bool = True) -> Dict[str, Any]:
+                        backends: List[str] = None, parallel: bool = True,
+                        parallel_mode: ParallelMode = 'thread') -> Dict[str, Any]:
         """
         Compare multiple OCR backends on the same PDF
         
@@ -135,6 +298,10 @@ class OCREvaluationFramework:
             pages: List of page numbers to process
             backends: List of backend names to compare (None for all available)
             parallel: Whether to run evaluations in parallel
+            parallel_mode: 'thread' shares this process's backends, 'process' runs
+                each backend in its own worker process (true overlap for
+                GIL-bound backends, at the cost of loading the models again there),
+                'sequential' runs them one after another
             
         Returns:
             Comparison results dictionary
@@ -143,32 +310,63 @@ class OCREvaluationFramework:
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         # Select backends to compare
-        backends_to_test = backends or list(self.backends.keys())
-        available_backends = [b for b in backends_to_test if b in self.backends]
+        backends_to_test = backends or self.backend_names
+        available_backends = [b for b in backends_to_test
+                              if b in self.backend_names and b not in self._failed_backends]
+        
+        if not parallel or len(available_backends) == 1:
+            parallel_mode = 'sequential'
+        
+        if parallel_mode != 'process':
+            # Worker processes build their own backends; only the others are needed here
+            self._initialize_backends(available_backends)
+            available_backends = [b for b in available_backends if b in self.backends]
         
         if not available_backends:
             raise ValueError("No available backends to test")
         
-        logger.info(f"Comparing {len(available_backends)} backends: {available_backends}")
-        logger.info(f"PDF: {pdf_path}, Pages: {pages or 'all'}")
+        logger.info("Comparing %d backends: %s", len(available_backends), available_backends)
+        logger.info("PDF: %s, Pages: %s", pdf_path, pages or 'all')
         
         comparison_start = time.time()
         results = {}
         
-        if parallel and len(available_backends) > 1:
+        if parallel_mode in ('thread', 'process'):
+            # Warm the page cache once so the backends' concurrent first reads
+            # of the PDF don't all fault on the same cold blocks
+            prefetch_file(pdf_path)
+            
             # Parallel execution
-            with concurrent.futures.ThreadPoolExecutor(max_workers=len(available_backends)) as executor:
-                future_to_backend = {
-                    executor.submit(self.evaluate_single_backend, backend, pdf_path, pages): backend
-                    for backend in available_backends
-                }
+            if parallel_mode == 'thread':
+                executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(available_backends))
+            else:
+                # spawn: CUDA and Paddle do not survive fork
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=len(available_backends),
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            num_threads = max(1, (os.cpu_count() or 1) // len(available_backends))
+            # Workers are spawned on submit, inside this block, and start with the limit
+            thread_limit = _omp_thread_limit(num_threads) if parallel_mode == 'process' else nullcontext()
+            with thread_limit, executor:
+                if parallel_mode == 'thread':
+                    future_to_backend = {
+                        executor.submit(self.evaluate_single_backend, backend, pdf_path, pages): backend
+                        for backend in available_backends
+                    }
+                else:
+                    future_to_backend = {
+                        executor.submit(_evaluate_in_process, str(self.output_dir), self.use_cache,
+                                        backend, pdf_path, pages, num_threads): backend
+                        for backend in available_backends
+                    }
                 
                 for future in concurrent.futures.as_completed(future_to_backend):
                     backend = future_to_backend[future]
                     try:
                         results[backend] = future.result()
                     except Exception as e:
-                        logger.error(f"Error evaluating {backend}: {e}")
+                        logger.error("Error evaluating %s: %s", backend, e)
                         results[backend] = {'error': str(e)}
         else:
             # Sequential execution
@@ -185,7 +383,8 @@ class OCREvaluationFramework:
                 'backends_compared': available_backends,
                 'total_comparison_time': time.time() - comparison_start,
                 'timestamp': datetime.now().isoformat(),
-                'parallel_execution': parallel
+                'parallel_execution': parallel_mode != 'sequential',
+                'parallel_mode': parallel_mode
             },
             'individual_results': results,
             'comparison_summary': comparison_summary
@@ -223,15 +422,34 @@ class OCREvaluationFramework:
                 'overall_confidence': result.get('overall_confidence', 0.0),
                 'processing_time': result.get('processing_time', float('inf')),
                 'pages_per_second': result.get('total_pages', 0) / max(result.get('processing_time', 1), 0.001),
-                'words_per_second': result.get('total_words', 0) / max(result.get('processing_time', 1), 0.001)
+                'words_per_second': result.get('total_words', 0) / max(result.get('processing_time', 1), 0.001),
+                # A cached result's time comes from an earlier run
+                'timed': not result.get('evaluation', {}).get('cached', False)
             }
             backend_metrics.append(metrics)
         
         if not backend_metrics:
             return summary
         
+        # All numeric metrics in one table, one row per backend
+        table = np.array(
+            [(m['overall_confidence'], m['words_per_second'], m['processing_time'], m['total_words'])
+             for m in backend_metrics],
+            dtype=[('confidence', 'f8'), ('speed', 'f8'), ('processing_time', 'f8'), ('total_words', 'f8')]
+        )
+        confidences = table['confidence']
+        speeds = table['speed']
+        timed = np.array([m['timed'] for m in backend_metrics], dtype=bool)
+        
+        def descending(values: np.ndarray, only: np.ndarray = None) -> List[Dict[str, Any]]:
+            # Stable, so ties keep the results order like sorted(reverse=True)
+            order = np.argsort(-values, kind='stable')
+            if only is not None:
+                order = order[only[order]]
+            return [backend_metrics[i] for i in order]
+        
         # Rank by confidence (accuracy proxy)
-        accuracy_sorted = sorted(backend_metrics, key=lambda x: x['overall_confidence'], reverse=True)
+        accuracy_sorted = descending(confidences)
         summary['accuracy_ranking'] = [
             {
                 'rank': i + 1,
@@ -242,8 +460,8 @@ class OCREvaluationFramework:
             for i, item in enumerate(accuracy_sorted)
         ]
         
-        # Rank by speed (words per second)
-        speed_sorted = sorted(backend_metrics, key=lambda x: x['words_per_second'], reverse=True)
+        # Rank by speed (words per second), timed in this run only
+        speed_sorted = descending(speeds, only=timed)
         summary['speed_ranking'] = [
             {
                 'rank': i + 1,
@@ -255,18 +473,16 @@ class OCREvaluationFramework:
         ]
         
         # Overall performance ranking (balanced score)
-        for item in backend_metrics:
-            # Normalize scores (0-1)
-            max_confidence = max(m['overall_confidence'] for m in backend_metrics)
-            max_speed = max(m['words_per_second'] for m in backend_metrics)
-            
-            normalized_confidence = item['overall_confidence'] / max(max_confidence, 0.001)
-            normalized_speed = item['words_per_second'] / max(max_speed, 0.001)
-            
-            # Weighted score (60% accuracy, 40% speed)
-            item['performance_score'] = 0.6 * normalized_confidence + 0.4 * normalized_speed
+        # Normalize scores (0-1) against the best backend, computed once
+        normalized_confidence = confidences / max(confidences.max(), 0.001)
+        normalized_speed = speeds / max(speeds[timed].max() if timed.any() else 0.0, 0.001)
+        
+        # Weighted score (60% accuracy, 40% speed)
+        performance_scores = 0.6 * normalized_confidence + 0.4 * normalized_speed
+        for item, score in zip(backend_metrics, performance_scores.tolist()):
+            item['performance_score'] = score
         
-        performance_sorted = sorted(backend_metrics, key=lambda x: x['performance_score'], reverse=True)
+        performance_sorted = descending(performance_scores, only=timed)
         summary['performance_ranking'] = [
             {
                 'rank': i + 1,
@@ -281,12 +497,13 @@ class OCREvaluationFramework:
         # Generate statistics
         summary['statistics'] = {
             'total_backends_tested': len(backend_metrics),
-            'avg_confidence': sum(m['overall_confidence'] for m in backend_metrics) / len(backend_metrics),
-            'avg_processing_time': sum(m['processing_time'] for m in backend_metrics) / len(backend_metrics),
-            'avg_words_extracted': sum(m['total_words'] for m in backend_metrics) / len(backend_metrics),
+            'avg_confidence': float(confidences.mean()),
+            'avg_processing_time': float(table['processing_time'][timed].mean()) if timed.any() else None,
+            'avg_words_extracted': float(table['total_words'].mean()),
             'best_accuracy': accuracy_sorted[0]['backend'] if accuracy_sorted else None,
             'fastest_backend': speed_sorted[0]['backend'] if speed_sorted else None,
-            'best_overall': performance_sorted[0]['backend'] if performance_sorted else None
+            'best_overall': performance_sorted[0]['backend'] if performance_sorted else None,
+            'cached_backends': [m['backend'] for m in backend_metrics if not m['timed']]
         }
         
         return summary
@@ -308,28 +525,10 @@ class OCREvaluationFramework:
         
         filepath = self.output_dir / filename
         
-        # Convert numpy types to Python native types for JSON serialization
-        def convert_numpy_types(obj):
-            """Convert numpy types to JSON serializable types"""
-            if isinstance(obj, np.integer):
-                return int(obj)
-            elif isinstance(obj, np.floating):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {key: convert_numpy_types(value) for key, value in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            return obj
-        
-        # Clean the results
-        clean_results = convert_numpy_types(results)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(clean_results, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"Results saved to: {filepath}")
+        # Serialized in one pass; numpy types need no recursive pre-conversion
+        _dump_to(filepath, results, indent=True)
+        
+        logger.info("Results saved to: %s", filepath)
         return str(filepath)
     
     def benchmark_all_backends(self, pdf_path: str, num_pages: int = 3) -> Dict[str, Any]:
@@ -343,18 +542,19 @@ class OCREvaluationFramework:
         Returns:
             Benchmark results dictionary
         """
-        logger.info(f"Benchmarking all backends on {pdf_path} ({num_pages} pages)")
+        logger.info("Benchmarking all backends on %s (%d pages)", pdf_path, num_pages)
         
         benchmark_results = {}
         
+        self._initialize_backends(self.backend_names)
         for backend_name, backend in self.backends.items():
-            logger.info(f"Benchmarking {backend_name}...")
+            logger.info("Benchmarking %s...", backend_name)
             try:
                 benchmark_result = backend.benchmark_performance(pdf_path, num_pages)
                 benchmark_results[backend_name] = benchmark_result
-                logger.info(f"{backend_name}: {benchmark_result.get('words_per_second', 0):.2f} words/sec")
+                logger.info("%s: %.2f words/sec", backend_name, benchmark_result.get('words_per_second', 0))
             except Exception as e:
-                logger.error(f"Benchmark failed for {backend_name}: {e}")
+                logger.error("Benchmark failed for %s: %s", backend_name, e)
                 benchmark_results[backend_name] = {'error': str(e)}
         
         return benchmark_results
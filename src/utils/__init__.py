@@ -3,6 +3,13 @@ Utility modules for the OCR evaluation framework
 """
 
 from .logger import setup_logger, get_logger
-from .file_handler import detect_pdf_type, is_text_pdf
+from .file_handler import detect_pdf_type, is_text_pdf, clear_pdf_type_cache, PDFSession
+from .pdf_renderer import (render_pdf_pages, iter_page_images, clear_page_cache, prerender_pdf_pages,
+                           is_blank_page, page_number)
+from .raw_results import (raw_result_columns, empty_raw_result, to_records, json_default,
+                          NumpyJSONEncoder)
 
-__all__ = ['setup_logger', 'get_logger', 'detect_pdf_type', 'is_text_pdf']
+__all__ = ['setup_logger', 'get_logger', 'detect_pdf_type', 'is_text_pdf', 'clear_pdf_type_cache',
+           'PDFSession', 'render_pdf_pages', 'iter_page_images', 'clear_page_cache',
+           'prerender_pdf_pages', 'is_blank_page', 'page_number', 'raw_result_columns',
+           'empty_raw_result', 'to_records', 'json_default', 'NumpyJSONEncoder']
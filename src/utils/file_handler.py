@@ -1,24 +1,101 @@
 # File handling utilities
 # src/utils/file_handler.py
-import pdfplumber
-import logging
-import warnings
-
-# Suppress pdfminer warnings about PDF parsing issues
-logging.getLogger('pdfminer').setLevel(logging.ERROR)
-warnings.filterwarnings('ignore', category=UserWarning, module='pdfminer')
-
-def is_text_pdf(pdf_path: str, page_no: int = 0, char_threshold: int = 20) -> bool:
-    with pdfplumber.open(pdf_path) as pdf:
-        page = pdf.pages[page_no]
-        text = page.extract_text() or ""
-    return len(text.strip()) >= char_threshold
-
-def detect_pdf_type(pdf_path: str) -> str:
-    with pdfplumber.open(pdf_path) as pdf:
-        for i in range(min(3, len(pdf.pages))):
-            text = pdf.pages[i].extract_text() or ""
-            if len(text.strip()) >= 20:
-                return "text"
-        # No page had enough text -> assume scanned
-        return "scanned"
+import fitz  # PyMuPDF: text extraction in C, much faster than pdfminer
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Optional, Tuple, Union
+
+# Suppress MuPDF warnings about PDF parsing issues
+fitz.TOOLS.mupdf_display_errors(False)
+
+# Scan results of recently classified PDFs, least recently used first
+SCAN_CACHE_SIZE = 256
+_SCAN_CACHE: "OrderedDict[tuple, Tuple[bool, Optional[int]]]" = OrderedDict()
+_SCAN_CACHE_LOCK = threading.Lock()
+
+def prefetch_file(path: str) -> None:
+    # Ask the kernel to start reading the whole file into the page cache
+    # without waiting for it; later opens of the same file then start warm
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+class PDFSession:
+    # Opens a PDF once so several utilities can share the parsed document:
+    #   with PDFSession(path) as doc:
+    #       detect_pdf_type(doc); is_text_pdf(doc, 1)
+    def __init__(self, pdf_path: str):
+        self.doc = fitz.open(pdf_path)
+    
+    def __enter__(self) -> fitz.Document:
+        return self.doc
+    
+    def __exit__(self, *exc_info):
+        self.doc.close()
+
+@contextmanager
+def open_document(doc_or_path: Union[str, fitz.Document]):
+    # Yield an open document; only documents opened here are closed again
+    if isinstance(doc_or_path, fitz.Document):
+        yield doc_or_path
+    else:
+        with PDFSession(doc_or_path) as doc:
+            yield doc
+
+def _file_key(pdf_path: str) -> tuple:
+    # A rewritten PDF changes mtime or size, so it misses the cache
+    stat = os.stat(pdf_path)
+    return os.path.abspath(pdf_path), stat.st_mtime, stat.st_size
+
+def _scan_pages_uncached(doc_or_path: Union[str, fitz.Document], first_page: int, max_pages: int,
+                         threshold: int) -> Tuple[bool, Optional[int]]:
+    with open_document(doc_or_path) as doc:
+        for page_no, page in enumerate(islice(doc, first_page, first_page + max_pages), first_page):
+            text = page.get_text("text") or ""
+            if len(text.strip()) >= threshold:
+                return True, page_no
+    return False, None
+
+def _scan_pages(doc_or_path: Union[str, fitz.Document], first_page: int = 0, max_pages: int = 3,
+                threshold: int = 20) -> Tuple[bool, Optional[int]]:
+    # At most one open per scan (none for an open document), stopping at the
+    # first page with a text layer; returns (is_text, first_text_page)
+    pdf_path = doc_or_path.name if isinstance(doc_or_path, fitz.Document) else doc_or_path
+    if not pdf_path:
+        # Opened from a stream: nothing to key the cache on
+        return _scan_pages_uncached(doc_or_path, first_page, max_pages, threshold)
+    
+    key = (_file_key(pdf_path), first_page, max_pages, threshold)
+    with _SCAN_CACHE_LOCK:
+        if key in _SCAN_CACHE:
+            _SCAN_CACHE.move_to_end(key)
+            return _SCAN_CACHE[key]
+    
+    # Scanned outside the lock so other PDFs aren't held up meanwhile
+    result = _scan_pages_uncached(doc_or_path, first_page, max_pages, threshold)
+    with _SCAN_CACHE_LOCK:
+        _SCAN_CACHE[key] = result
+        while len(_SCAN_CACHE) > SCAN_CACHE_SIZE:
+            _SCAN_CACHE.popitem(last=False)
+    return result
+
+def clear_pdf_type_cache():
+    # Forget every cached classification, e.g. after replacing PDFs in place
+    with _SCAN_CACHE_LOCK:
+        _SCAN_CACHE.clear()
+
+def is_text_pdf(doc_or_path: Union[str, fitz.Document], page_no: int = 0,
+                char_threshold: int = 20) -> bool:
+    return _scan_pages(doc_or_path, page_no, 1, char_threshold)[0]
+
+def detect_pdf_type(doc_or_path: Union[str, fitz.Document]) -> str:
+    is_text, _ = _scan_pages(doc_or_path, 0, 3, 20)
+    # No page had enough text -> assume scanned
+    return "text" if is_text else "scanned"
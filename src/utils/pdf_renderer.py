@@ -0,0 +1,285 @@
+"""
+PDF rasterization utilities shared by the OCR backends
+"""
+
+import asyncio
+import atexit
+import errno
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import numpy as np
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import Image
+
+# Rendered PDFs kept on disk for reuse, least recently used first; each entry
+# maps (path, mtime, dpi, grayscale, pages) to a _CachedRender
+PAGE_CACHE_SIZE = 4
+_PAGE_CACHE: "OrderedDict[tuple, _CachedRender]" = OrderedDict()
+_PAGE_CACHE_LOCK = threading.Lock()
+
+# A page is blank when fewer than BLANK_INK_RATIO of its pixels are darker
+# than BLANK_INK_LEVEL (0-255 grayscale)
+BLANK_INK_LEVEL = 200
+BLANK_INK_RATIO = 0.002
+
+# Rasterizations started from asyncio code run one at a time per event loop;
+# pdftoppm already uses every core, and concurrent runs only exhaust file
+# descriptors. One semaphore per loop, since a semaphore is bound to the loop
+# that first awaits it
+_render_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+class _CachedRender:
+    """A cached rendering: its folder, the paths once rendered, and how many callers use it"""
+    
+    def __init__(self):
+        self.folder = tempfile.mkdtemp(prefix='ocr-pages-')
+        self.paths: "Future[List[str]]" = Future()
+        self.pins = 0
+
+
+def _evict_unpinned():
+    """Drop least recently used entries over PAGE_CACHE_SIZE that no caller is using (lock held)"""
+    excess = len(_PAGE_CACHE) - PAGE_CACHE_SIZE
+    for key in [key for key, entry in _PAGE_CACHE.items() if entry.pins == 0][:max(excess, 0)]:
+        shutil.rmtree(_PAGE_CACHE.pop(key).folder, ignore_errors=True)
+
+
+def _unpin(key: tuple, entry: _CachedRender):
+    """Release a caller's use of entry, deleting it if it left the cache meanwhile"""
+    with _PAGE_CACHE_LOCK:
+        entry.pins -= 1
+        if _PAGE_CACHE.get(key) is not entry:
+            if entry.pins == 0:
+                shutil.rmtree(entry.folder, ignore_errors=True)
+        else:
+            _evict_unpinned()
+
+
+def render_thread_count() -> int:
+    """Number of pdftoppm threads to rasterize with (one per core)."""
+    return max(1, os.cpu_count() or 1)
+
+
+def page_number(path: str) -> int:
+    """0-indexed page number of a rendered page, from pdftoppm's '<name>-<page>' file name"""
+    return int(os.path.splitext(os.path.basename(path))[0].rsplit('-', 1)[1]) - 1
+
+
+def _normalize_pages(pdf_path: str, pages: List[int]) -> List[int]:
+    """Sorted, unique page numbers, dropping those past the end of the document"""
+    page_count = pdfinfo_from_path(pdf_path)['Pages']
+    return sorted({page for page in pages if 0 <= page < page_count})
+
+
+def _is_sparse(pages: List[int]) -> bool:
+    """Whether rendering the span of pages would rasterize mostly unwanted pages"""
+    return bool(pages) and (pages[-1] - pages[0] + 1) > 2 * len(pages)
+
+
+def _render_single_page(pdf_path: str, page: int, dpi: int, grayscale: bool,
+                        output_folder: str) -> str:
+    """Render one page (0-indexed) and return its image path"""
+    return convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        first_page=page + 1,
+        last_page=page + 1,
+        output_folder=output_folder,
+        output_file=f"page{page:05d}",
+        grayscale=grayscale,
+        paths_only=True
+    )[0]
+
+
+def _render(pdf_path: str, dpi: int, pages: List[int], grayscale: bool,
+            output_folder: str) -> List[str]:
+    """Rasterize the requested pages into output_folder and return their paths"""
+    try:
+        if pages:
+            # pdftoppm clamps the range, so pages past the end yield no file
+            pages = _normalize_pages(pdf_path, pages)
+            if not pages:
+                return []
+        
+        if _is_sparse(pages):
+            # One single-page pdftoppm process per requested page, in parallel
+            with ThreadPoolExecutor(max_workers=render_thread_count()) as executor:
+                return list(executor.map(
+                    lambda page: _render_single_page(pdf_path, page, dpi, grayscale, output_folder),
+                    pages
+                ))
+        
+        paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=pages[0] + 1 if pages else None,
+            last_page=pages[-1] + 1 if pages else None,
+            thread_count=render_thread_count(),
+            output_folder=output_folder,
+            grayscale=grayscale,
+            paths_only=True
+        )
+        if pages:
+            # Drop the gaps of a non-contiguous selection; files are matched to
+            # pages by the page number in their name, not by position
+            wanted = set(pages)
+            for path in paths:
+                if page_number(path) not in wanted:
+                    os.remove(path)
+            paths = [path for path in paths if page_number(path) in wanted]
+        return paths
+    except OSError as e:
+        if e.errno == errno.EMFILE:
+            raise OSError(
+                e.errno,
+                f"Too many open files while rasterizing {pdf_path}; raise the "
+                f"open file limit (e.g. `ulimit -n 4096`) or process fewer pages at once"
+            ) from e
+        raise
+
+
+@contextmanager
+def render_pdf_pages(pdf_path: str, dpi: int = 200, pages: List[int] = None,
+                     grayscale: bool = False, cache: bool = False) -> Iterator[List[str]]:
+    """
+    Rasterize a PDF to image files with pdftoppm running on every core
+    
+    Only paths are returned; open the pages one at a time with
+    iter_page_images so memory stays flat regardless of page count.
+    
+    By default the pages live in a temporary folder removed when the block
+    exits. With cache enabled, the rendered files are kept for the most
+    recent PAGE_CACHE_SIZE (PDF, settings) combinations, for callers that
+    really render the same pages again (e.g. prerender_pdf_pages); a
+    modified PDF gets a new entry. Concurrent callers with the same settings
+    share one rendering, and an entry is never evicted while a caller is
+    inside its with-block. Either way, the files must be used inside the
+    with-block.
+    
+    A sparse selection such as [0, 50, 99] renders each page with its own
+    pdftoppm call instead of rasterizing the whole span between them.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        dpi: DPI for PDF to image conversion
+        pages: List of page numbers to render (0-indexed). If None, render all pages.
+            Duplicates and pages past the end of the document are dropped
+        grayscale: Render single-channel 'L' pages, a third of the bytes of RGB
+        cache: Reuse and keep rendered pages across calls (off, so timings
+            measure rendering)
+        
+    Yields:
+        List of rendered page image paths, in ascending page order; page_number
+        gives the page each one shows
+    """
+    if not cache:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield _render(pdf_path, dpi, pages, grayscale, temp_dir)
+        return
+    
+    key = (os.path.abspath(pdf_path), os.path.getmtime(pdf_path), dpi, grayscale,
+           tuple(pages) if pages else None)
+    with _PAGE_CACHE_LOCK:
+        entry = _PAGE_CACHE.get(key)
+        owner = entry is None
+        if owner:
+            entry = _PAGE_CACHE[key] = _CachedRender()
+        else:
+            _PAGE_CACHE.move_to_end(key)
+        # Pinned until the caller leaves the with-block, so eviction skips it
+        entry.pins += 1
+    
+    try:
+        if owner:
+            # Rendered outside the lock; other callers for this key wait on the future
+            try:
+                entry.paths.set_result(_render(pdf_path, dpi, pages, grayscale, entry.folder))
+            except BaseException as e:
+                with _PAGE_CACHE_LOCK:
+                    if _PAGE_CACHE.get(key) is entry:
+                        del _PAGE_CACHE[key]
+                entry.paths.set_exception(e)
+                raise
+        yield list(entry.paths.result())
+    finally:
+        _unpin(key, entry)
+
+
+def clear_page_cache():
+    """Delete every cached rendering; ones still in use go when their last caller is done"""
+    with _PAGE_CACHE_LOCK:
+        while _PAGE_CACHE:
+            entry = _PAGE_CACHE.popitem()[1]
+            if entry.pins == 0:
+                shutil.rmtree(entry.folder, ignore_errors=True)
+
+
+atexit.register(clear_page_cache)
+
+
+def _prerender(pdf_path: str, dpi: int, pages: List[int], grayscale: bool):
+    with render_pdf_pages(pdf_path, dpi=dpi, pages=pages, grayscale=grayscale, cache=True):
+        pass
+
+
+async def prerender_pdf_pages(pdf_path: str, dpi: int = 200, pages: List[int] = None,
+                              grayscale: bool = False):
+    """
+    Render a PDF into the page cache without blocking the event loop
+    
+    pdftoppm runs in a worker thread, and only one PDF is rasterized at a time
+    so that a heavy document cannot starve co-located requests of file
+    descriptors. A following render_pdf_pages call with the same settings is
+    served from the cache when it passes cache=True.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        dpi: DPI for PDF to image conversion
+        pages: List of page numbers to render (0-indexed). If None, render all pages
+        grayscale: Render single-channel 'L' pages
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _render_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _render_semaphores[loop] = asyncio.Semaphore(1)
+    async with semaphore:
+        await asyncio.to_thread(_prerender, pdf_path, dpi, pages, grayscale)
+
+
+def is_blank_page(image: Image.Image) -> bool:
+    """
+    Cheap ink count used to skip OCR on empty pages
+    
+    Args:
+        image: Rendered page
+        
+    Returns:
+        True if the page has (almost) no dark pixels
+    """
+    gray = np.asarray(image if image.mode == 'L' else image.convert('L'))
+    return np.count_nonzero(gray < BLANK_INK_LEVEL) < BLANK_INK_RATIO * gray.size
+
+
+def iter_page_images(paths: List[str]) -> Iterator[Image.Image]:
+    """
+    Load rendered pages one at a time
+    
+    Args:
+        paths: Page image paths from render_pdf_pages
+        
+    Yields:
+        Fully loaded page images, in page order
+    """
+    for path in paths:
+        image = Image.open(path)
+        image.load()  # decodes the pixels and closes the file
+        yield image
@@ -0,0 +1,77 @@
+"""
+Columnar (struct-of-arrays) storage for per-word OCR results
+"""
+
+import json
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+
+
+def raw_result_columns(bboxes: Sequence, texts: Sequence[str], confidences: Sequence[float],
+                       **extra_columns: Sequence) -> Dict[str, np.ndarray]:
+    """
+    Build a page's raw_result as parallel arrays instead of one dict per word
+    
+    Args:
+        bboxes: [N, 4] boxes as (left, top, right, bottom)
+        texts: N recognized texts
+        confidences: N confidences in [0, 1]
+        **extra_columns: Further N-long columns (e.g. region index)
+    
+    Returns:
+        Dictionary with an int32 'bbox' [N, 4] array, an object 'text' array,
+        a float32 'confidence' array and any extra columns
+    """
+    columns = {
+        'bbox': np.asarray(bboxes, dtype=np.int32).reshape(-1, 4),
+        'text': np.asarray(texts, dtype=object).reshape(-1),
+        'confidence': np.asarray(confidences, dtype=np.float32).reshape(-1)
+    }
+    for name, values in extra_columns.items():
+        columns[name] = np.asarray(values).reshape(-1)
+    return columns
+
+
+def empty_raw_result() -> Dict[str, np.ndarray]:
+    """raw_result of a page without recognized words"""
+    return raw_result_columns([], [], [])
+
+
+def to_records(raw_result: Union[Dict[str, np.ndarray], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Convert a columnar raw_result back to the list of per-word dicts
+    
+    Args:
+        raw_result: Columnar raw_result, as arrays or as lists after a JSON
+            round-trip (lists of dicts are returned unchanged)
+    
+    Returns:
+        List of dictionaries with one entry per word and plain Python values
+    """
+    if not isinstance(raw_result, dict):
+        return list(raw_result)
+    names = list(raw_result)
+    columns = (raw_result[name] for name in names)
+    rows = zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in columns))
+    return [dict(zip(names, row)) for row in rows]
+
+
+def json_default(obj: Any) -> Any:
+    """orjson default hook for the arrays orjson cannot serialize itself (e.g. text)"""
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class NumpyJSONEncoder(json.JSONEncoder):
+    """json encoder that converts numpy nodes as they are reached, without a pre-walk"""
+    
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, (np.ndarray, np.generic)):
+            return obj.tolist()
+        return super().default(obj)